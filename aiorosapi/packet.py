@@ -1,6 +1,9 @@
 #
 # -+- coding: utf-8 -+-
 
+import sys
+from collections.abc import Mapping
+
 from .exceptions import RosApiSentenceOrderException
 
 
@@ -192,3 +195,90 @@ class RosApiSentenceEncoder(object):
         :return: buffer contents as bytestring
         """
         return self._buffer + self._encode_word('')
+
+
+class RosApiKeyTable(dict):
+    """
+    Table of decoded and interned attribute names, indexed by raw bytes
+    """
+    def __init__(self, encoding='utf-8'):
+        super().__init__()
+        self._encoding = encoding
+        self._prefixes = {}
+
+    def __missing__(self, raw):
+        key = sys.intern(raw.decode(self._encoding, 'replace'))
+        self[raw] = key
+        return key
+
+    def prefix(self, key):
+        """
+        Return raw `=key=` prefix of attribute word
+        :param key: attribute name, string
+        :return: prefix as a bytestring or None if key can't be present in attribute word
+        """
+        try: return self._prefixes[key]
+        except KeyError: pass
+
+        if not isinstance(key, str) or '=' in key: return None
+
+        prefix = b'=' + key.encode(self._encoding) + b'='
+        self._prefixes[key] = prefix
+        return prefix
+
+
+class RosApiLazyRow(Mapping):
+    """
+    Read-only mapping over raw `=key=value` words of a single sentence.
+    Words are scanned and values are decoded only when accessed
+    """
+    __slots__ = ('_words', '_keys', '_encoding')
+
+    def __init__(self, words, keys, encoding='utf-8'):
+        """
+        Create new row
+        :param words: list of raw attribute words (without reply word)
+        :param keys: RosApiKeyTable to resolve attribute names
+        :param encoding: which encoding to use while converting values to python strings
+        """
+        self._words = words
+        self._keys = keys
+        self._encoding = encoding
+
+    def _find(self, key):
+        prefix = self._keys.prefix(key)
+        if prefix is None: return None, 0
+
+        # last word wins, same as for dicts returned by _parse_kv
+        for word in reversed(self._words):
+            if word.startswith(prefix): return word, len(prefix)
+
+        return None, 0
+
+    def __getitem__(self, key):
+        word, pos = self._find(key)
+        if word is None: raise KeyError(key)
+        return word[pos:].decode(self._encoding, 'replace')
+
+    def __contains__(self, key):
+        return self._find(key)[0] is not None
+
+    def __iter__(self):
+        keys = self._keys
+        seen = set()
+
+        for word in self._words:
+            if not word.startswith(b'='): continue
+            pos = word.find(b'=', 1)
+            if pos < 0: continue
+
+            key = keys[word[1:pos]]
+            if key in seen: continue
+            seen.add(key)
+            yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return '{}({!r})'.format(self.__class__.__name__, dict(self.items()))
@@ -2,10 +2,10 @@
 # -+- coding: utf-8 -+-
 
 import asyncio
-from asyncio import QueueEmpty
-from collections import namedtuple
+import logging
+from collections import namedtuple, deque
 
-from .packet import RosApiSentenceEncoder, RosApiWordParser
+from .packet import RosApiSentenceEncoder, RosApiWordParser, RosApiKeyTable, RosApiLazyRow
 from .exceptions import RosApiConnectionLostException, RosApiCommunicationException, RosApiNoResultsException, \
     RosApiTooManyResultsException, RosApiTrapException, RosApiFatalException, RosApiLoginFailureException, \
     RosApiCommunicationTimeoutException
@@ -29,15 +29,32 @@ class RosApiProtocol(asyncio.Protocol, LoggingMixin):
     def logging_proto(self):
         return self.logging.getChild('protocol')
 
-    def __init__(self, talk_encoding='utf-8', answer_timeout=30, loop=None):
+    def __init__(self, talk_encoding='utf-8', answer_timeout=30, lazy_rows=False, loop=None):
+        """
+        Create new protocol instance
+        :param talk_encoding: which encoding to use while converting API words to python strings
+        :param answer_timeout: seconds to wait for every next sentence of an answer, None to wait forever;
+                               trickling bytes without completing a sentence does not extend it
+        :param lazy_rows: return result sentences as RosApiLazyRow mappings, decoding values only on access
+        :param loop: event loop to use
+        """
         self._talk_encoding = talk_encoding
+        self._keys = RosApiKeyTable(talk_encoding)
+        self._lazy_rows = lazy_rows
         self._loop = loop or asyncio.get_event_loop()
 
         self._parser = RosApiWordParser()
         self._disconnected = self._loop.create_future()
-        self._received_frames = asyncio.Queue()
+
+        self._sentence = []
+        self._received_sentences = deque()
+        self._sentence_waiter = None
+        self._talk_lock = asyncio.Lock()
 
         self._answer_timeout = answer_timeout
+        self._answer_timer = None
+        self._answer_request = None
+        self._last_sentence = None
 
     def connection_made(self, t):
         self.logging_raw.debug("Connected to API {}".format(t))
@@ -47,13 +64,30 @@ class RosApiProtocol(asyncio.Protocol, LoggingMixin):
         self.logging_raw.debug("Connection lost: {}".format(e))
         self._transport = None
         self._disconnected.set_result(True)
-        self._received_frames.put_nowait(RosApiConnectionLostException)
+        self._received_sentences.append(RosApiConnectionLostException)
+        self._wakeup_waiter()
 
     def data_received(self, data):
-        self.logging_raw.debug('Received data: {}'.format(data))
+        logger = self.logging_raw
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug: logger.debug('Received data: {}'.format(data))
+
+        completed = False
+        sentence = self._sentence
         for out in self._parser.feed(data):
-            self.logging_raw.debug('Received frame: {}'.format(out))
-            self._received_frames.put_nowait(out)
+            if debug: logger.debug('Received frame: {}'.format(out))
+            if out:
+                sentence.append(out)
+                continue
+
+            self._received_sentences.append(sentence)
+            sentence = []
+            completed = True
+
+        self._sentence = sentence
+        if completed:
+            self._last_sentence = self._loop.time()
+            self._wakeup_waiter()
 
     def eof_received(self):
         return False
@@ -61,19 +95,64 @@ class RosApiProtocol(asyncio.Protocol, LoggingMixin):
     def is_connected(self):
         return self._transport is not None
 
+    def _wakeup_waiter(self, exc=None):
+        """
+        Wake up coroutine waiting in _receive_sentence()
+        :param exc: exception to raise in waiting coroutine, None for normal wakeup
+        :return: None
+        """
+        waiter = self._sentence_waiter
+        if waiter is None: return
+
+        self._sentence_waiter = None
+        if waiter.done(): return
+
+        if exc is None: waiter.set_result(None)
+        else: waiter.set_exception(exc)
+
+    def _start_answer_timer(self):
+        if self._answer_timeout is None: return
+
+        request = object()
+        self._answer_request = request
+        self._last_sentence = self._loop.time()
+        self._answer_timer = self._loop.call_later(self._answer_timeout, self._on_answer_timeout, request)
+
+    def _stop_answer_timer(self):
+        self._answer_request = None
+        if self._answer_timer is None: return
+
+        self._answer_timer.cancel()
+        self._answer_timer = None
+
+    def _on_answer_timeout(self, request):
+        # timer of already finished request
+        if request is not self._answer_request: return
+
+        # next sentence is not late yet or received one is not consumed yet, move deadline
+        deadline = self._last_sentence + self._answer_timeout
+        waiter = self._sentence_waiter
+        if deadline > self._loop.time() or waiter is None or waiter.done():
+            self._answer_timer = self._loop.call_at(deadline, self._on_answer_timeout, request)
+            return
+
+        self._answer_timer = None
+        self._wakeup_waiter(RosApiCommunicationTimeoutException("No answer from device"))
+
     async def _receive_sentence(self):
-        answer = []
-        while True:
+        while not self._received_sentences:
             if not self.is_connected(): raise RosApiConnectionLostException()
-            r = await self._received_frames.get()
-            if r is RosApiConnectionLostException: raise RosApiConnectionLostException()
-            if r is b'': break
-            answer.append(r)
+            self._sentence_waiter = self._loop.create_future()
+            await self._sentence_waiter
+
+        answer = self._received_sentences.popleft()
+        if answer is RosApiConnectionLostException: raise RosApiConnectionLostException()
 
         return answer
 
     def _parse_kv(self, answer, encoding=None):
         encoding = encoding or self._talk_encoding
+        keys = self._keys if encoding == self._talk_encoding else RosApiKeyTable(encoding)
 
         parsed = {}
         skipped = []
@@ -82,7 +161,7 @@ class RosApiProtocol(asyncio.Protocol, LoggingMixin):
             if item.startswith(b'='):
                 kv = item[1:].split(b'=', 1)
                 if len(kv) == 2:
-                    k = kv[0].decode(encoding, 'replace')
+                    k = keys[kv[0]]
                     v = kv[1].decode(encoding, 'replace')
                     parsed[k] = v
 
@@ -123,21 +202,36 @@ class RosApiProtocol(asyncio.Protocol, LoggingMixin):
     async def _talk(self, sentence):
         self.logging_proto.debug('API REQUEST {}'.format(sentence))
 
-        if self._transport is None: raise RosApiConnectionLostException()
-        self._transport.write(sentence)
+        # answers are not tagged, so requests are sent one at a time
+        async with self._talk_lock:
+            if self._transport is None: raise RosApiConnectionLostException()
+            self._transport.write(sentence)
+
+            self._start_answer_timer()
+            try:
+                ret, results, exception, exception_info = await self._receive_answer()
+            finally:
+                self._stop_answer_timer()
 
+        if exception is not None:
+            raise exception(exception_info)
+
+        return RosApiAnswer(ret, results)
+
+    async def _receive_answer(self):
         exception = None
         exception_info = []
 
         results = []
 
+        debug = self.logging_proto.isEnabledFor(logging.DEBUG)
+
         while True:
-            try: answer = await asyncio.wait_for(self._receive_sentence(), self._answer_timeout)
-            except asyncio.TimeoutError: raise RosApiCommunicationTimeoutException("No answer from device")
+            answer = await self._receive_sentence()
 
             if len(answer) == 0: raise RosApiCommunicationException("Zero length answer")
 
-            self.logging_proto.debug("API ANSWER {}".format(answer))
+            if debug: self.logging_proto.debug("API ANSWER {}".format(answer))
 
             ans = answer[0]
             if ans == self.DONE_REPLY:
@@ -145,6 +239,12 @@ class RosApiProtocol(asyncio.Protocol, LoggingMixin):
                 if len(skip): self.logging_proto.debug('skipped words in !done answer: {}'.format(skip))
                 break
 
+            elif ans == self.DATA_REPLY and self._lazy_rows:
+                results.append(RosApiLazyRow(answer[1:], self._keys, self._talk_encoding))
+                if debug:
+                    skip = [w for w in answer[1:] if not w.startswith(b'=') or w.find(b'=', 1) < 0]
+                    if len(skip): self.logging_proto.debug("skipped words in !data answer: {}".format(skip))
+
             elif ans == self.DATA_REPLY:
                 result, skip = self._parse_kv(answer[1:])
                 results.append(result)
@@ -160,10 +260,7 @@ class RosApiProtocol(asyncio.Protocol, LoggingMixin):
                 exception_info, skip = self._parse_kv(answer[1:])
                 if len(skip): self.logging_proto.debug("skipped words in !fatal answer: {}".format(skip))
 
-        if exception is not None:
-            raise exception(exception_info)
-
-        return RosApiAnswer(ret, results)
+        return ret, results, exception, exception_info
 
     # developer-side api
 
@@ -183,12 +280,11 @@ class RosApiProtocol(asyncio.Protocol, LoggingMixin):
 
     async def flush(self):
         """
-        Flush internal frame buffer
+        Flush internal sentence buffer
         :return: None
         """
-        while True:
-            try: self._received_frames.get_nowait()
-            except QueueEmpty: break
+        self._sentence = []
+        self._received_sentences.clear()
 
     async def execute(self, cmd, attrs=None, query=None):
         """
@@ -341,19 +437,20 @@ class RosApiProtocol(asyncio.Protocol, LoggingMixin):
             raise RosApiLoginFailureException("Login failure: {}".format(e))
 
 
-async def create_ros_connection(host, port, username, password):
+async def create_ros_connection(host, port, username, password, lazy_rows=False):
     """
     Create new RouterOS API connection
     :param host: hostname
     :param port: tcp port to use
     :param username: user name
     :param password: password
+    :param lazy_rows: return result sentences as RosApiLazyRow mappings, decoding values only on access
     :return: connected RosApiProtocol instance
     :exception RosApiLoginFailureException on unsuccessful login
     """
     loop = asyncio.get_event_loop()
 
-    t, p = await loop.create_connection(lambda: RosApiProtocol(), host, port)
+    t, p = await loop.create_connection(lambda: RosApiProtocol(lazy_rows=lazy_rows), host, port)
     await p.login(username, password)
 
     return p
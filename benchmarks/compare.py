@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -+- coding: utf-8 -+-
+
+"""
+Compare two JSON reports produced by benchmarks.run
+
+    python -m benchmarks.compare before.json after.json
+"""
+
+import argparse
+import json
+import sys
+
+
+def _key(r):
+    return r['group'], r['name'], json.dumps(r['params'], sort_keys=True)
+
+
+def _load(path):
+    with open(path) as f:
+        report = json.load(f)
+    return report['meta'], {_key(r): r for r in report['results']}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='compare aiorosapi benchmark reports')
+    ap.add_argument('base', help='baseline report')
+    ap.add_argument('new', help='report to compare with baseline')
+    args = ap.parse_args(argv)
+
+    base_meta, base = _load(args.base)
+    new_meta, new = _load(args.new)
+
+    print('base: {} ({}, python {})'.format(args.base, base_meta['version'], base_meta['python']))
+    print(' new: {} ({}, python {})'.format(args.new, new_meta['version'], new_meta['python']))
+
+    for key, r in new.items():
+        group, name, params = key
+        b = base.get(key)
+        if b is None:
+            print('{:>6s} {:<16s} {:<72s} {:>12s}'.format(group, name, params, 'new'))
+            continue
+
+        if not r['sec_per_op']:
+            print('{:>6s} {:<16s} {:<72s} {:>12s}'.format(group, name, params, 'n/a'))
+            continue
+
+        speedup = b['sec_per_op'] / r['sec_per_op']
+        print('{:>6s} {:<16s} {:<72s} {:>11.2f}x'.format(group, name, params, speedup))
+
+    for key in base:
+        if key in new: continue
+        group, name, params = key
+        print('{:>6s} {:<16s} {:<72s} {:>12s}'.format(group, name, params, 'removed'))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,28 @@
+#
+# -+- coding: utf-8 -+-
+
+"""
+Feature detection, so the suite can be run against older aiorosapi versions
+"""
+
+import inspect
+
+from aiorosapi.protocol import RosApiProtocol
+
+try: from aiorosapi.packet import RosApiKeyTable, RosApiLazyRow
+except ImportError: RosApiKeyTable = RosApiLazyRow = None
+
+
+HAS_LAZY_ROWS = RosApiLazyRow is not None and \
+    'lazy_rows' in inspect.signature(RosApiProtocol).parameters
+
+
+def make_protocol(loop, lazy_rows=False):
+    """
+    Create protocol instance, passing only arguments supported by installed version
+    :param loop: event loop to use
+    :param lazy_rows: enable lazy rows, must be False if HAS_LAZY_ROWS is False
+    :return: RosApiProtocol instance
+    """
+    if lazy_rows: return RosApiProtocol(lazy_rows=True, loop=loop)
+    return RosApiProtocol(loop=loop)
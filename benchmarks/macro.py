@@ -0,0 +1,147 @@
+#
+# -+- coding: utf-8 -+-
+
+import asyncio
+import gc
+import time
+
+from aiorosapi.packet import RosApiSentenceEncoder
+
+from .compat import HAS_LAZY_ROWS, make_protocol
+
+
+class LoopbackTransport(object):
+    """
+    In-process transport answering every write with predefined data.
+    Data is delivered in chunks, one chunk per event loop iteration, like a socket would do
+    """
+    def __init__(self, protocol, answer, chunk_size=65536):
+        self._protocol = protocol
+        self._answer = answer
+        self._chunk_size = chunk_size
+        self._loop = asyncio.get_event_loop()
+
+    def write(self, data):
+        self._loop.call_soon(self._deliver, 0)
+
+    def _deliver(self, offset):
+        chunk = self._answer[offset:offset + self._chunk_size]
+        self._protocol.data_received(chunk)
+        offset += self._chunk_size
+        if offset < len(self._answer): self._loop.call_soon(self._deliver, offset)
+
+    def close(self):
+        self._loop.call_soon(self._protocol.connection_lost, None)
+
+
+def make_table(rows, fields):
+    """
+    Build encoded answer for synthetic table.
+    Rows are made from one pre-encoded template, only fixed-width .id differs
+    :param rows: number of !re sentences
+    :param fields: number of attributes in each sentence
+    :return: answer as a bytestring
+    """
+    enc = RosApiSentenceEncoder()
+    end = enc._encode_word(b'')
+
+    head = enc._encode_word(b'!re') + enc._encode_length(len(b'=.id=*00000000')) + b'=.id=*'
+    tail = b''.join(
+        enc._encode_word('=field-{}=value-{}'.format(f, f).encode()) for f in range(fields - 1)
+    ) + end
+
+    chunks = []
+    for i in range(rows):
+        chunks.append(head)
+        chunks.append(b'%08X' % i)
+        chunks.append(tail)
+
+    chunks.append(enc._encode_word(b'!done'))
+    chunks.append(end)
+    return b''.join(chunks)
+
+
+def _connect(answer, lazy_rows):
+    proto = make_protocol(asyncio.get_event_loop(), lazy_rows)
+    proto.connection_made(LoopbackTransport(proto, answer))
+    return proto
+
+
+async def _throughput(rows, fields, lazy_rows, repeat):
+    answer = make_table(rows, fields)
+    proto = _connect(answer, lazy_rows)
+
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        items = await proto.talk_all('/ip/firewall/connection/print')
+        # touch a couple of columns, like typical callers do
+        if fields > 1:
+            for item in items: item['.id'], item['field-0']
+        else:
+            for item in items: item['.id']
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+        # drop result before next pass, so it does not add to peak memory and gc pauses
+        del items
+
+    return {
+        'group': 'macro',
+        'name': 'throughput',
+        'params': {'rows': rows, 'fields': fields, 'lazy_rows': lazy_rows, 'bytes': len(answer)},
+        'sec_per_op': best,
+        'rows_per_sec': rows / best,
+        'mib_per_sec': len(answer) / best / 2 ** 20,
+    }
+
+
+async def _latency(fields, lazy_rows, requests):
+    proto = _connect(make_table(1, fields), lazy_rows)
+
+    gc.collect()
+
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        await proto.talk_one('/system/resource/print')
+        samples.append(time.perf_counter() - start)
+
+    samples.sort()
+    return {
+        'group': 'macro',
+        'name': 'latency',
+        'params': {'fields': fields, 'lazy_rows': lazy_rows, 'requests': requests},
+        'sec_per_op': samples[len(samples) // 2],
+        'p50': samples[len(samples) // 2],
+        'p99': samples[min(len(samples) - 1, len(samples) * 99 // 100)],
+        'max': samples[-1],
+    }
+
+
+async def _run(rows, fields, repeat, requests):
+    out = []
+    for lazy_rows in ((False, True) if HAS_LAZY_ROWS else (False,)):
+        out.append(await _latency(fields, lazy_rows, requests))
+        for count in rows:
+            out.append(await _throughput(count, fields, lazy_rows, repeat))
+    return out
+
+
+def run(rows=(1000, 10000), fields=30, repeat=3, requests=1000):
+    """
+    Run end-to-end benchmarks of RosApiProtocol over loopback transport
+    :param rows: table sizes to measure
+    :param fields: number of attributes in each row
+    :param repeat: how many times to repeat each throughput measurement, best one is reported
+    :param requests: number of requests for latency measurement
+    :return: list of result dicts
+    """
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(_run(rows, fields, repeat, requests))
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
@@ -0,0 +1,171 @@
+#
+# -+- coding: utf-8 -+-
+
+import asyncio
+import timeit
+
+from aiorosapi.packet import RosApiSentenceEncoder, RosApiWordParser
+
+from .compat import HAS_LAZY_ROWS, RosApiKeyTable, RosApiLazyRow, make_protocol
+
+
+# word sizes by length prefix width
+LENGTH_WIDTHS = {
+    1: 0x10,
+    2: 0x80,
+    3: 0x4000,
+    4: 0x200000,
+    5: 0x10000000,
+}
+
+# 5-byte prefix needs a 256MiB word, only length encoding is measured for it
+WORD_WIDTHS = (1, 2, 3, 4)
+
+# word parser works byte-by-byte, 2MiB words of 4-byte prefix take too long to measure
+PARSE_WORD_WIDTHS = (1, 2, 3)
+
+
+def _measure(stmt, repeat):
+    """
+    Measure callable with timeit
+    :param stmt: callable to measure
+    :param repeat: how many times to repeat measurement
+    :return: best time per call in seconds
+    """
+    t = timeit.Timer(stmt)
+    number, _ = t.autorange()
+    return min(t.repeat(repeat, number)) / number
+
+
+def _result(name, params, seconds, **extra):
+    out = {
+        'group': 'micro',
+        'name': name,
+        'params': params,
+        'sec_per_op': seconds,
+        'ops_per_sec': 1 / seconds if seconds else None,
+    }
+    out.update(extra)
+    return out
+
+
+def _make_row(i, fields):
+    row = [b'=.id=*' + '{:X}'.format(i).encode()]
+    for f in range(fields - 1):
+        row.append('=field-{}=value-{}-{}'.format(f, i, f).encode())
+    return row
+
+
+def bench_encode_length(repeat, loop):
+    enc = RosApiSentenceEncoder()
+    out = []
+    for width, length in LENGTH_WIDTHS.items():
+        sec = _measure(lambda: enc._encode_length(length), repeat)
+        out.append(_result('encode_length', {'width': width, 'length': length}, sec))
+    return out
+
+
+def bench_encode_word(repeat, loop):
+    enc = RosApiSentenceEncoder()
+    out = []
+    for width in WORD_WIDTHS:
+        word = b'x' * LENGTH_WIDTHS[width]
+        sec = _measure(lambda: enc._encode_word(word), repeat)
+        out.append(_result('encode_word', {'width': width, 'size': len(word)}, sec))
+    return out
+
+
+def bench_encode_sentence(repeat, loop, fields=(1, 10, 30)):
+    out = []
+    for count in fields:
+        attrs = {'attr-{}'.format(i): 'value-{}'.format(i) for i in range(count)}
+        sec = _measure(lambda: RosApiSentenceEncoder('/ip/address/set', attrs).get_buffer(), repeat)
+        out.append(_result('encode_sentence', {'fields': count}, sec))
+    return out
+
+
+def bench_parse_word(repeat, loop):
+    enc = RosApiSentenceEncoder()
+    parser = RosApiWordParser()
+    out = []
+    for width in PARSE_WORD_WIDTHS:
+        size = LENGTH_WIDTHS[width]
+        data = enc._encode_word(b'x' * size)
+        sec = _measure(lambda: parser.feed(data), repeat)
+        out.append(_result('parse_word', {'width': width, 'size': size}, sec,
+                           bytes_per_sec=size / sec if sec else None))
+    return out
+
+
+def bench_parse_sentence(repeat, loop, fields=(1, 10, 30)):
+    enc = RosApiSentenceEncoder()
+    parser = RosApiWordParser()
+    out = []
+    for count in fields:
+        data = b''.join(enc._encode_word(w) for w in [b'!re'] + _make_row(1, count)) + enc._encode_word(b'')
+        sec = _measure(lambda: parser.feed(data), repeat)
+        out.append(_result('parse_sentence', {'fields': count, 'bytes': len(data)}, sec))
+    return out
+
+
+def bench_parse_kv(repeat, loop, fields=(1, 10, 30)):
+    proto = make_protocol(loop)
+    out = []
+    for count in fields:
+        row = _make_row(1, count)
+        sec = _measure(lambda: proto._parse_kv(row), repeat)
+        out.append(_result('parse_kv', {'fields': count}, sec))
+    return out
+
+
+def bench_lazy_row(repeat, loop, fields=(1, 10, 30)):
+    if not HAS_LAZY_ROWS: return []
+
+    keys = RosApiKeyTable()
+    out = []
+    for count in fields:
+        row = _make_row(1, count)
+        # construction plus one field access, like callers reading only .id
+        sec = _measure(lambda: RosApiLazyRow(row, keys)['.id'], repeat)
+        out.append(_result('lazy_row', {'fields': count}, sec))
+    return out
+
+
+def bench_parse_obj(repeat, loop, fields=(1, 10, 30)):
+    proto = make_protocol(loop)
+    out = []
+    for count in fields:
+        obj = ''.join('key{}=v1;v2;v3'.format(i) for i in range(count))
+        sec = _measure(lambda: proto._parse_obj(obj), repeat)
+        out.append(_result('parse_obj', {'fields': count, 'chars': len(obj)}, sec))
+    return out
+
+
+BENCHMARKS = (
+    bench_encode_length,
+    bench_encode_word,
+    bench_encode_sentence,
+    bench_parse_word,
+    bench_parse_sentence,
+    bench_parse_kv,
+    bench_lazy_row,
+    bench_parse_obj,
+)
+
+
+def run(repeat=5):
+    """
+    Run all microbenchmarks
+    :param repeat: how many times to repeat each measurement, best one is reported
+    :return: list of result dicts
+    """
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        out = []
+        for bench in BENCHMARKS:
+            out += bench(repeat, loop)
+        return out
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -+- coding: utf-8 -+-
+
+"""
+Run aiorosapi benchmarks and save results as JSON
+
+    python -m benchmarks.run -o before.json
+    python -m benchmarks.run -o after.json
+    python -m benchmarks.compare before.json after.json
+
+To measure another version, copy this directory into its checkout and run it from there.
+
+Word parser is byte-oriented, throughput runs take about 1 second per 2MB of answer
+per pass. Large tables are practical with fewer fields and a single pass:
+
+    python -m benchmarks.run --skip-micro --rows 100000 1000000 --fields 5 --repeat 1 -o large.json
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+
+import aiorosapi
+
+from . import micro, macro
+
+
+def _format(r):
+    params = ' '.join('{}={}'.format(k, v) for k, v in r['params'].items())
+    return '{:>6s} {:<16s} {:<50s} {:>14.3f} us'.format(r['group'], r['name'], params, r['sec_per_op'] * 1e6)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='aiorosapi benchmark suite')
+    ap.add_argument('-o', '--output', help='write results to this JSON file')
+    ap.add_argument('--rows', type=int, nargs='+', default=[1000, 10000],
+                    help='table sizes for throughput runs')
+    ap.add_argument('--fields', type=int, default=30, help='attributes per row for throughput runs')
+    ap.add_argument('--repeat', type=int, default=3, help='repetitions per measurement, best one is reported')
+    ap.add_argument('--requests', type=int, default=1000, help='number of requests for latency runs')
+    ap.add_argument('--skip-micro', action='store_true', help='do not run microbenchmarks')
+    ap.add_argument('--skip-macro', action='store_true', help='do not run end-to-end benchmarks')
+    args = ap.parse_args(argv)
+
+    results = []
+    if not args.skip_micro:
+        results += micro.run(args.repeat)
+    if not args.skip_macro:
+        results += macro.run(args.rows, args.fields, args.repeat, args.requests)
+
+    for r in results: print(_format(r))
+
+    if args.output:
+        report = {
+            'meta': {
+                'version': aiorosapi.__version__,
+                'python': platform.python_version(),
+                'implementation': platform.python_implementation(),
+                'platform': platform.platform(),
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            },
+            'results': results,
+        }
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -22,6 +22,6 @@ setup(
         "Operating System :: OS Independent",
     ],
 
-    packages=find_packages(exclude=["tests"]),
+    packages=find_packages(exclude=["tests", "benchmarks"]),
     test_suite='tests'
 )
@@ -1,9 +1,12 @@
 #
 # -+- coding: utf-8 -+-
 
+import asyncio
+import tracemalloc
 import unittest
 
-from aiorosapi.packet import RosApiSentenceEncoder, RosApiWordParser
+from aiorosapi.protocol import RosApiProtocol
+from aiorosapi.packet import RosApiSentenceEncoder, RosApiWordParser, RosApiKeyTable, RosApiLazyRow
 
 
 class RosApiSentenceTest(unittest.TestCase):
@@ -44,3 +47,54 @@ class RosApiSentenceTest(unittest.TestCase):
 
         out = t.feed(b'\x00')
         self.assertEqual([b''], out)
+
+
+class RosApiLazyRowTest(unittest.TestCase):
+    def test_key_table(self):
+        t = RosApiKeyTable()
+
+        k1 = t[b'name']
+        k2 = t[bytes(b'na') + b'me']
+        self.assertEqual('name', k1)
+        self.assertIs(k1, k2)
+
+    def test_lazy_row(self):
+        t = RosApiKeyTable()
+        r = RosApiLazyRow([b'=.id=*1', b'=name=ether1', b'=comment=a=b', b'.tag=1', b'=broken'], t)
+
+        self.assertEqual('*1', r['.id'])
+        self.assertEqual('a=b', r['comment'])
+        self.assertEqual(3, len(r))
+        self.assertNotIn('broken', r)
+        self.assertIsNone(r.get('missing'))
+        self.assertEqual({'.id': '*1', 'name': 'ether1', 'comment': 'a=b'}, dict(r))
+
+    def test_lazy_row_memory(self):
+        words = [['=field-{}=value-{}-{}'.format(f, i, f).encode() for f in range(30)] for i in range(1000)]
+
+        def measure(make_row):
+            make_row(words[0])['field-0']
+
+            tracemalloc.start()
+            try:
+                rows = []
+                for w in words:
+                    row = make_row(w)
+                    row['field-0']
+                    rows.append(row)
+                return tracemalloc.get_traced_memory()[0]
+            finally:
+                tracemalloc.stop()
+
+        loop = asyncio.new_event_loop()
+        try:
+            proto = RosApiProtocol(loop=loop)
+            eager = measure(lambda w: proto._parse_kv(w)[0])
+        finally:
+            loop.close()
+
+        t = RosApiKeyTable()
+        lazy = measure(lambda w: RosApiLazyRow(w, t))
+
+        # raw words are kept in both cases, rows must not add a decoded copy of them
+        self.assertLess(lazy, eager)
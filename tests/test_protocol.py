@@ -0,0 +1,157 @@
+#
+# -+- coding: utf-8 -+-
+
+import asyncio
+import unittest
+
+from aiorosapi.packet import RosApiSentenceEncoder
+from aiorosapi.protocol import RosApiProtocol
+from aiorosapi.exceptions import RosApiTrapException, RosApiCommunicationTimeoutException, \
+    RosApiConnectionLostException
+
+
+def encode_sentence(*words):
+    t = RosApiSentenceEncoder(words[0])
+    for w in words[1:]: t._buffer += t._encode_word(w)
+    return t.get_buffer()
+
+
+class FakeTransport(object):
+    """
+    Transport answering every write with predefined data, split into small chunks
+    """
+    def __init__(self, protocol, answer, chunk_size=7, delay=None):
+        self._protocol = protocol
+        self._answer = answer
+        self._chunk_size = chunk_size
+        self._delay = delay
+        self.written = []
+
+    def write(self, data):
+        self.written.append(data)
+        loop = asyncio.get_event_loop()
+        for n, i in enumerate(range(0, len(self._answer), self._chunk_size)):
+            chunk = self._answer[i:i + self._chunk_size]
+            if self._delay is None: loop.call_soon(self._protocol.data_received, chunk)
+            else: loop.call_later(n * self._delay, self._protocol.data_received, chunk)
+
+    def close(self):
+        asyncio.get_event_loop().call_soon(self._protocol.connection_lost, None)
+
+
+class RosApiProtocolTest(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        asyncio.set_event_loop(None)
+        self.loop.close()
+
+    def _make_protocol(self, answer, chunk_size=7, delay=None, **kwargs):
+        p = RosApiProtocol(loop=self.loop, **kwargs)
+        p.connection_made(FakeTransport(p, answer, chunk_size, delay))
+        return p
+
+    def test_talk_all(self):
+        answer = encode_sentence('!re', '=.id=*1', '=name=ether1') + \
+                 encode_sentence('!re', '=.id=*2', '=name=ether2') + \
+                 encode_sentence('!done', '=ret=ok')
+
+        p = self._make_protocol(answer)
+        ret, items = self.loop.run_until_complete(p.execute('/interface/print'))
+
+        self.assertEqual({'ret': 'ok'}, ret)
+        self.assertEqual([{'.id': '*1', 'name': 'ether1'}, {'.id': '*2', 'name': 'ether2'}], items)
+
+    def test_lazy_rows(self):
+        answer = encode_sentence('!re', '=.id=*1', '=name=ether1') + \
+                 encode_sentence('!re', '=.id=*2', '=name=ether2') + \
+                 encode_sentence('!done')
+
+        p = self._make_protocol(answer, lazy_rows=True)
+        items = self.loop.run_until_complete(p.talk_all('/interface/print'))
+
+        self.assertEqual(['*1', '*2'], [i['.id'] for i in items])
+        self.assertEqual({'.id': '*2', 'name': 'ether2'}, dict(items[1]))
+
+    def test_lazy_rows_skipped_words(self):
+        answer = encode_sentence('!re', '=.id=*1', '.tag=5') + encode_sentence('!done')
+
+        p = self._make_protocol(answer, lazy_rows=True)
+        with self.assertLogs(p.logging_proto, 'DEBUG') as cm:
+            items = self.loop.run_until_complete(p.talk_all('/interface/print'))
+
+        self.assertEqual({'.id': '*1'}, dict(items[0]))
+        self.assertTrue(any('skipped words in !data answer' in l for l in cm.output))
+
+    def test_trap(self):
+        answer = encode_sentence('!trap', '=message=failure') + encode_sentence('!done')
+
+        p = self._make_protocol(answer)
+        with self.assertRaises(RosApiTrapException):
+            self.loop.run_until_complete(p.talk_all('/interface/print'))
+
+    def test_timeout(self):
+        answer = encode_sentence('!re', '=.id=*1')
+
+        p = self._make_protocol(answer, answer_timeout=0.05)
+        with self.assertRaises(RosApiCommunicationTimeoutException):
+            self.loop.run_until_complete(p.talk_all('/interface/print'))
+
+    def test_timeout_moves_with_sentences(self):
+        row = encode_sentence('!re', '=.id=*1')
+        answer = row * 4 + encode_sentence('!done')
+
+        # whole answer takes longer than answer_timeout, gaps between sentences are shorter
+        p = self._make_protocol(answer, chunk_size=len(row), delay=0.02, answer_timeout=0.05)
+        start = self.loop.time()
+        items = self.loop.run_until_complete(p.talk_all('/interface/print'))
+
+        self.assertEqual(4, len(items))
+        self.assertGreater(self.loop.time() - start, 0.05)
+
+    def test_timeout_trickling_sentence(self):
+        answer = encode_sentence('!re', '=.id=*1', '=name=ether1') + encode_sentence('!done')
+
+        # bytes keep arriving, but no sentence is completed within answer_timeout
+        p = self._make_protocol(answer, chunk_size=1, delay=0.01, answer_timeout=0.05)
+        with self.assertRaises(RosApiCommunicationTimeoutException):
+            self.loop.run_until_complete(p.talk_all('/interface/print'))
+
+    def test_timeout_after_late_wakeup(self):
+        answer = encode_sentence('!re', '=.id=*1')
+
+        # timer fires right after data_received woke up the request, but before it resumed
+        p = self._make_protocol(answer, chunk_size=len(answer), answer_timeout=0)
+        with self.assertRaises(RosApiCommunicationTimeoutException):
+            self.loop.run_until_complete(asyncio.wait_for(p.talk_all('/interface/print'), 1))
+
+    def test_concurrent_talk(self):
+        answer = encode_sentence('!re', '=.id=*1') + encode_sentence('!done')
+
+        p = self._make_protocol(answer)
+        r1, r2 = self.loop.run_until_complete(asyncio.wait_for(
+            asyncio.gather(p.talk_all('/a'), p.talk_all('/b')), 1
+        ))
+
+        self.assertEqual([{'.id': '*1'}], r1)
+        self.assertEqual([{'.id': '*1'}], r2)
+
+    def test_concurrent_timeout(self):
+        answer = encode_sentence('!re', '=.id=*1')
+
+        p = self._make_protocol(answer, answer_timeout=0.05)
+        out = self.loop.run_until_complete(asyncio.wait_for(
+            asyncio.gather(p.talk_all('/a'), p.talk_all('/b'), return_exceptions=True), 1
+        ))
+
+        for r in out: self.assertIsInstance(r, RosApiCommunicationTimeoutException)
+
+    def test_connection_lost(self):
+        answer = encode_sentence('!re', '=.id=*1')
+
+        p = self._make_protocol(answer)
+        self.loop.call_later(0.01, p.connection_lost, None)
+        with self.assertRaises(RosApiConnectionLostException):
+            self.loop.run_until_complete(p.talk_all('/interface/print'))